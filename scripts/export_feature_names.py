@@ -0,0 +1,18 @@
+"""
+Export the model's input feature names, in training order, to models/feature_names.json
+so the dashboard can read them without unpickling the scaler at start-up.
+
+Run from the repository root whenever models/scaler.joblib is retrained:
+    python scripts/export_feature_names.py
+"""
+import json
+import joblib
+
+FEATURE_NAMES_PATH = "models/feature_names.json"
+
+if __name__ == "__main__":
+    scaler = joblib.load("models/scaler.joblib")
+    feature_names = list(scaler.feature_names_in_)
+    with open(FEATURE_NAMES_PATH, "w", encoding="utf-8") as f:
+        json.dump(feature_names, f, indent=2)
+    print(f"Wrote {FEATURE_NAMES_PATH} ({len(feature_names)} features)")
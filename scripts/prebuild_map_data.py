@@ -0,0 +1,21 @@
+"""
+Pre-build the simplified map layers and area lookup used by the dashboard,
+so the app skips reprojection and simplification at start-up.
+
+Run from the repository root whenever data/wa_census_spatial_2021.gpkg changes:
+    python scripts/prebuild_map_data.py
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from geo_processing import (
+    AREA_LOOKUP_PATH, DETAIL_GEOJSON_PATH, OVERVIEW_GEOJSON_PATH,
+    build_map_data, write_map_data
+)
+
+if __name__ == "__main__":
+    write_map_data(*build_map_data())
+    for path in (OVERVIEW_GEOJSON_PATH, DETAIL_GEOJSON_PATH, AREA_LOOKUP_PATH):
+        print(f"Wrote {path} ({os.path.getsize(path) / 1e6:.1f} MB)")
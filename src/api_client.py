@@ -1,32 +1,119 @@
 import requests
+import orjson
 import os
+import streamlit as st
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from dotenv import load_dotenv
+from reliability import prediction_breaker
 
 load_dotenv()
 
 # Fetch API URL from environment variables
 API_URL = os.getenv("API_URL", "http://localhost:5000")
 
+# Retry transient gateway/throttling responses with exponential backoff.
+# Connection failures and read timeouts are never retried, so a dead or stalled
+# backend still fails fast and a POST that may have reached the service is not re-sent.
+# 4xx payload errors are surfaced by raise_for_status() instead of re-sent.
+# Retry-After is ignored so a throttling service cannot stretch a click past
+# the request timeout; the backoff alone caps the added wait at 0.5s.
+_retry = Retry(
+    total=2,
+    connect=0,
+    read=0,
+    other=0,
+    backoff_factor=0.25,
+    status_forcelist=(429, 502, 503, 504),
+    allowed_methods=frozenset(["GET", "POST"]),
+    respect_retry_after_header=False,
+    raise_on_status=False
+)
+
+@st.cache_resource(show_spinner=False)
+def get_session():
+    """
+    Return the pooled session used for all API calls.
+    Cached as a resource so one connection pool is shared across sessions and
+    survives Streamlit's script hot-reloads, letting keep-alive reuse connections.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=_retry)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    # The health probe is never retried: it runs on every sidebar render and a
+    # failed probe already falls back to local inference, so one attempt is enough
+    session.mount(f"{API_URL}/health", HTTPAdapter(max_retries=0))
+    return session
+
+# (connect, read) timeouts for the health probe: a healthy service answers in
+# milliseconds, so a dead one should not stall the sidebar for long
+HEALTH_TIMEOUT = (1.0, 1.0)
+
 def check_api_health():
     """Verify if the Flask API is reachable."""
     try:
-        response = requests.get(f"{API_URL}/health", timeout=5)
+        response = get_session().get(f"{API_URL}/health", timeout=HEALTH_TIMEOUT)
         return response.status_code == 200
     except requests.exceptions.RequestException:
         return False
 
+# Request bodies are pre-encoded with orjson, so the content type is set explicitly
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+def encode_body(body):
+    """Encode a request body with orjson, accepting NumPy scalars and arrays like the stdlib encoder did for floats."""
+    return orjson.dumps(body, option=orjson.OPT_SERIALIZE_NUMPY)
+
+def _post_json(path, body, timeout):
+    """POST 'body' to the API through the circuit breaker and return the decoded JSON."""
+    # Encoded before the breaker is consulted, so a bad payload cannot strand a HALF_OPEN probe
+    data = encode_body(body)
+    if not prediction_breaker.allow_request():
+        return {"status": "error", "message": "circuit open"}
+
+    try:
+        # Streamed so an error response is closed without downloading its body
+        with get_session().post(
+            f"{API_URL}{path}",
+            data=data,
+            headers=JSON_HEADERS,
+            timeout=timeout,
+            stream=True
+        ) as response:
+            response.raise_for_status()
+            # Parse the raw bytes directly, skipping requests' text decoding step
+            result = orjson.loads(response.content)
+    except orjson.JSONDecodeError as e:
+        prediction_breaker.record_failure()
+        return {"status": "error", "message": f"Invalid JSON from API: {e}"}
+    except requests.exceptions.RequestException as e:
+        # 4xx means the service is up but rejected the payload; don't trip the breaker
+        status = getattr(e.response, "status_code", None)
+        if status is not None and status < 500:
+            prediction_breaker.record_success()
+        else:
+            prediction_breaker.record_failure()
+        return {"status": "error", "message": str(e), "status_code": status}
+    except BaseException:
+        # Anything unexpected still settles the breaker, so a probe is never left in flight
+        prediction_breaker.record_failure()
+        raise
+
+    prediction_breaker.record_success()
+    return result
+
 def get_prediction(features):
     """
     Send feature data to the Flask API and return the prediction.
     'features' should be a dictionary.
     """
-    try:
-        response = requests.post(
-            f"{API_URL}/predict",
-            json=features,
-            timeout=10
-        )
-        response.raise_for_status()
-        return response.json()
-    except requests.exceptions.RequestException as e:
-        return {"status": "error", "message": str(e)}
\ No newline at end of file
+    return _post_json("/predict", features, timeout=10)
+
+def get_predictions_batch(rows):
+    """
+    Send several feature dictionaries in one request to the Flask API.
+    'rows' should be a list of dictionaries; on success the response holds a
+    'predictions' list in the same order.
+    """
+    return _post_json("/predict_batch", rows, timeout=30)
@@ -0,0 +1,80 @@
+import asyncio
+import atexit
+import threading
+import aiohttp
+import orjson
+from api_client import API_URL, JSON_HEADERS, encode_body
+from reliability import prediction_breaker
+
+# aiohttp sessions are bound to the event loop that created them, so a single
+# long-lived loop on a daemon thread lets the session and its pool outlive each call
+_loop = None
+_loop_lock = threading.Lock()
+_aio_session = None
+
+def _get_loop():
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="api-client-loop", daemon=True).start()
+    return _loop
+
+async def _get_aio_session():
+    # Only ever called on the background loop, so no lock is needed here
+    global _aio_session
+    if _aio_session is None or _aio_session.closed:
+        _aio_session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=20, ttl_dns_cache=300),
+            timeout=aiohttp.ClientTimeout(total=10)
+        )
+    return _aio_session
+
+async def aget_prediction(features):
+    """
+    Async counterpart of api_client.get_prediction with the same return shape.
+    'features' should be a dictionary.
+    """
+    # Encoded before the breaker is consulted, so a bad payload cannot strand a HALF_OPEN probe
+    data = encode_body(features)
+    if not prediction_breaker.allow_request():
+        return {"status": "error", "message": "circuit open"}
+
+    try:
+        session = await _get_aio_session()
+        async with session.post(f"{API_URL}/predict", data=data, headers=JSON_HEADERS) as response:
+            response.raise_for_status()
+            result = orjson.loads(await response.read())
+    except aiohttp.ClientResponseError as e:
+        # 4xx means the service is up but rejected the payload; don't trip the breaker
+        if e.status < 500:
+            prediction_breaker.record_success()
+        else:
+            prediction_breaker.record_failure()
+        return {"status": "error", "message": str(e)}
+    except orjson.JSONDecodeError as e:
+        prediction_breaker.record_failure()
+        return {"status": "error", "message": f"Invalid JSON from API: {e}"}
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        prediction_breaker.record_failure()
+        return {"status": "error", "message": str(e) or type(e).__name__}
+    except BaseException:
+        # Anything unexpected, cancellation included, still settles the breaker
+        prediction_breaker.record_failure()
+        raise
+
+    prediction_breaker.record_success()
+    return result
+
+async def aget_predictions(feature_rows):
+    """Send several predictions concurrently over the shared connection pool."""
+    return await asyncio.gather(*(aget_prediction(features) for features in feature_rows))
+
+def run_async(coro, timeout=None):
+    """Run a coroutine on the background loop and block until its result is ready."""
+    return asyncio.run_coroutine_threadsafe(coro, _get_loop()).result(timeout)
+
+@atexit.register
+def _close_aio_session():
+    if _loop is not None and _aio_session is not None and not _aio_session.closed:
+        asyncio.run_coroutine_threadsafe(_aio_session.close(), _loop).result(timeout=5)
@@ -0,0 +1,97 @@
+import os
+import geopandas as gpd
+import numpy as np
+import orjson
+import pandas as pd
+import shapely
+
+# Source boundaries and the pre-built map artifacts derived from them.
+# Paths are relative to the repository root, like the rest of the app.
+SPATIAL_PATH = "data/wa_census_spatial_2021.gpkg"
+OVERVIEW_GEOJSON_PATH = "src/static/wa_map_overview.geojson"
+DETAIL_GEOJSON_PATH = "src/static/wa_map_detail.geojson"
+AREA_LOOKUP_PATH = "data/wa_area_lookup.parquet"
+
+# Streamlit's static file server (server.enableStaticServing) exposes src/static/
+# at app/static/, so deck.gl fetches the layers by URL and the browser caches them
+OVERVIEW_GEOJSON_URL = "app/static/wa_map_overview.geojson"
+DETAIL_GEOJSON_URL = "app/static/wa_map_detail.geojson"
+
+# Simplification tolerances in metres.
+# 500m is sub-pixel at the state-wide zoom; 50m keeps detail once zoomed to an area.
+OVERVIEW_TOLERANCE = 500
+DETAIL_TOLERANCE = 50
+
+# Decimal places kept on WGS84 vertices; 5 places is roughly 1m, well below a rendered pixel
+COORD_PRECISION = 5
+
+def simplify_to_geojson(gdf, tolerance):
+    """Simplify projected (metre) geometries and return them as a WGS84 FeatureCollection dict."""
+    simplified = gdf.copy()
+    simplified['geometry'] = simplified.geometry.simplify(tolerance=tolerance, preserve_topology=True)
+    simplified = simplified.to_crs(epsg=4326)
+    # Quantise vertices so each coordinate serialises to a handful of digits, not ~15
+    simplified = simplified.set_geometry(
+        shapely.transform(simplified.geometry.values, lambda coords: np.round(coords, COORD_PRECISION))
+    )
+    # Build the FeatureCollection dict directly instead of a JSON string round-trip
+    return simplified.to_geo_dict(drop_id=False)
+
+def build_map_data(spatial_path=SPATIAL_PATH):
+    """
+    Run the full geometry pipeline on the source GPKG.
+    Returns the overview and detail FeatureCollections plus an area lookup
+    table of (code, name, centroid_lat, centroid_lon).
+    """
+    # Load raw data, projecting straight to metres for simplification
+    gdf = gpd.read_file(spatial_path).to_crs(epsg=3857)
+
+    # Centroid calculation for map snapping
+    # Computed while still projected so only the centroid points are reprojected
+    centroids_geo = gdf.geometry.centroid.to_crs(epsg=4326)
+    gdf['centroid_lat'] = centroids_geo.y
+    gdf['centroid_lon'] = centroids_geo.x
+
+    code_col = 'SAL_CODE21' if 'SAL_CODE21' in gdf.columns else gdf.columns[0]
+    name_col = 'SAL_NAME21' if 'SAL_NAME21' in gdf.columns else gdf.columns[1]
+
+    # Prepare lookup
+    names_lookup = pd.DataFrame(gdf[[code_col, name_col, 'centroid_lat', 'centroid_lon']])
+    names_lookup[code_col] = names_lookup[code_col].astype(str)
+
+    # Pre-format map hover string specifically for tooltip
+    # Formatted in one NumPy pass rather than a Python call per row (NaN still renders as "nan")
+    gdf['stress_label'] = np.char.mod("%.2f", gdf['housing_stress_index'].to_numpy(dtype=np.float64))
+
+    # --- GEOMETRY SIMPLIFICATION ---
+    # Only ship the properties read by the layer styling and tooltip to the browser
+    map_gdf = gdf[[code_col, name_col, 'housing_stress_index', 'stress_label', 'geometry']]
+    # Reduces number of polygon vertices to optimise browser performance.
+    geojson_overview = simplify_to_geojson(map_gdf, tolerance=OVERVIEW_TOLERANCE)
+    geojson_detail = simplify_to_geojson(map_gdf, tolerance=DETAIL_TOLERANCE)
+
+    return geojson_overview, geojson_detail, names_lookup
+
+def write_map_data(geojson_overview, geojson_detail, names_lookup):
+    """Write the pre-built map artifacts to the data directory."""
+    for path, geojson in ((OVERVIEW_GEOJSON_PATH, geojson_overview), (DETAIL_GEOJSON_PATH, geojson_detail)):
+        # orjson output is already compact UTF-8
+        with open(path, "wb") as f:
+            f.write(orjson.dumps(geojson))
+    names_lookup.to_parquet(AREA_LOOKUP_PATH, index=False)
+
+def load_map_data():
+    """
+    Load the detail layer, as raw GeoJSON bytes, and the area lookup from the pre-built
+    artifacts, running the full pipeline and writing them first if they have not been generated.
+    The browser fetches the layers by URL, so the detail features are only decoded
+    server-side, once, for the selection overlay.
+    """
+    artifacts = (OVERVIEW_GEOJSON_PATH, DETAIL_GEOJSON_PATH, AREA_LOOKUP_PATH)
+    if not all(os.path.exists(path) for path in artifacts):
+        write_map_data(*build_map_data())
+
+    with open(DETAIL_GEOJSON_PATH, "rb") as f:
+        geojson_detail_bytes = f.read()
+    names_lookup = pd.read_parquet(AREA_LOOKUP_PATH)
+    return geojson_detail_bytes, names_lookup
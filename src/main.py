@@ -1,13 +1,19 @@
 import streamlit as st
 import pandas as pd
-import geopandas as gpd
+import numpy as np
 import pydeck as pdk
-import json
 import plotly.express as px
+import plotly.graph_objects as go
 import joblib
+import json
+import orjson
 import os
 import sklearn 
-from api_client import check_api_health, get_prediction
+from geo_processing import (
+    AREA_LOOKUP_PATH, DETAIL_GEOJSON_PATH, DETAIL_GEOJSON_URL, OVERVIEW_GEOJSON_URL, load_map_data
+)
+from api_client import check_api_health, get_prediction, get_predictions_batch
+from async_client import aget_predictions, run_async
 
 st.set_page_config(page_title="WA Housing Model 2021", layout="wide")
 
@@ -71,60 +77,147 @@ st.markdown("""
     </style>
     """, unsafe_allow_html=True)
 
-@st.cache_resource
-def load_local_models():
+# Ensure paths are correct relative to root
+MODEL_PATH = "models/housing_stress_model.joblib"
+SCALER_PATH = "models/scaler.joblib"
+
+def file_versions(*paths):
+    """Modification times of the given files (None if missing), for use as a cache key."""
+    return tuple(os.path.getmtime(p) if os.path.exists(p) else None for p in paths)
+
+# Keys the model caches, so a retrained model is reloaded without restarting the server
+model_version = file_versions(MODEL_PATH, SCALER_PATH)
+
+@st.cache_resource(show_spinner=False)
+def load_local_models(model_version):
     """Load joblib models for local inference fallback."""
-    # Ensure paths are correct relative to root
-    model = joblib.load("models/housing_stress_model.joblib")
-    scaler = joblib.load("models/scaler.joblib")
+    model = joblib.load(MODEL_PATH)
+    scaler = joblib.load(SCALER_PATH)
     return model, scaler
 
-@st.cache_data
-def load_data():
-    # Load raw data
-    gdf = gpd.read_file("data/wa_census_spatial_2021.gpkg").to_crs("EPSG:4326")
-    df_raw = pd.read_csv("data/wa_census_master_2021.csv")
-    
-    # --- GEOMETRY SIMPLIFICATION ---
-    # Temporarily project to metres for accurate simplification, then back to degrees
-    # Reduces number of polygon vertices to optimise browser performance.
-    gdf = gdf.to_crs(epsg=3857)
-    # Reduced tolerance to 100m to restore visual detail while maintaining performance
-    gdf['geometry'] = gdf.geometry.simplify(tolerance=100, preserve_topology=True)
-    gdf = gdf.to_crs(epsg=4326)
+@st.cache_resource(show_spinner=False)
+def load_local_arrays(model_version):
+    """Return the local model with the StandardScaler's mean and scale as contiguous float64 arrays."""
+    model, scaler = load_local_models(model_version)
+    mean = np.ascontiguousarray(scaler.mean_, dtype=np.float64)
+    scale = np.ascontiguousarray(scaler.scale_, dtype=np.float64)
+    return model, mean, scale
+
+# Written by scripts/export_feature_names.py from the trained scaler
+FEATURE_NAMES_PATH = "models/feature_names.json"
+
+def load_feature_names():
+    """Return the model's input features in training order."""
+    if not os.path.exists(FEATURE_NAMES_PATH):
+        # Retrieve from scaler to ensure exact match with training phase
+        _, scaler = load_local_models(model_version)
+        return list(scaler.feature_names_in_)
+    with open(FEATURE_NAMES_PATH, encoding="utf-8") as f:
+        return json.load(f)
+
+@st.cache_data(ttl=30, show_spinner=False)
+def cached_health():
+    """Cache the API health check so reruns within the TTL skip the network call."""
+    return check_api_health()
+
+# Outline colours: a faint constant for every area, and a bright one for the selection overlay
+BASE_LINE_COLOR = [255, 255, 255, 50]
+HIGHLIGHT_LINE_COLOR = [0, 255, 255, 255]
+
+CENSUS_PATH = "data/wa_census_master_2021.csv"
+
+# Census columns read by the metrics tab and simulator; model features are added at load time
+DISPLAY_COLUMNS = [
+    'avg_weekly_income', 'avg_weekly_rent', 'avg_weekly_mortgage', 'unemployment_rate',
+    'housing_stress_index', 'total_mining', 'total_employed_full_time',
+    'total_employed_part_time', 'total_unemployed', 'renting_households_count',
+    'mortgage_households_count'
+]
+# Headcounts fit comfortably in 32 bits
+COUNT_DTYPES = {
+    'total_mining': 'int32', 'total_employed_full_time': 'int32', 'total_employed_part_time': 'int32',
+    'total_unemployed': 'int32', 'renting_households_count': 'int32', 'mortgage_households_count': 'int32'
+}
+
+# Everything load_data() reads. Also keys the map caches below, so a rebuild of the
+# map artifacts re-syncs the overlay and camera with the layers the browser fetches.
+data_version = file_versions(
+    CENSUS_PATH, FEATURE_NAMES_PATH, SCALER_PATH, AREA_LOOKUP_PATH, DETAIL_GEOJSON_PATH
+)
+
+# Persisted to disk so the CSV processing is not repeated after a server restart.
+# The cache key includes the function source, so edits here still invalidate it,
+# and 'data_version' carries the input files' mtimes, so regenerating them does too.
+@st.cache_data(persist="disk", show_spinner="Loading census data…")
+def load_data(data_version):
+    # Simplified map layers and area centroids are pre-built by scripts/prebuild_map_data.py
+    # The detail layer stays as opaque JSON bytes, so the cache stores and copies
+    # one buffer per rerun rather than pickling thousands of nested feature dicts
+    geojson_detail_bytes, names_lookup = load_map_data()
+    code_col, name_col = names_lookup.columns[:2]
     
     # Identify model features
-    # Retrieve from scaler to ensure exact match with training phase
-    _, scaler = load_local_models()
-    model_features = list(scaler.feature_names_in_)
-    
-    # Centroid calculation for map snapping
-    projected_gdf = gdf.to_crs(epsg=3857)
-    centroids_geo = projected_gdf.geometry.centroid.to_crs(epsg=4326)
-    gdf['centroid_lat'] = centroids_geo.y
-    gdf['centroid_lon'] = centroids_geo.x
-    
-    code_col = 'SAL_CODE21' if 'SAL_CODE21' in gdf.columns else gdf.columns[0]
-    name_col = 'SAL_NAME21' if 'SAL_NAME21' in gdf.columns else gdf.columns[1]
+    # Read from the exported name list so the scaler is only unpickled for local inference
+    model_features = load_feature_names()
     
-    # Prepare lookup
-    names_lookup = gdf[[code_col, name_col, 'centroid_lat', 'centroid_lon']].copy()
-    names_lookup[code_col] = names_lookup[code_col].astype(str)
-    
-    target_col = 'housing_stress_index'
+    # Only parse the columns the app uses rather than all ~650 census columns
     id_col = 'SAL_CODE_2021'
-    df_raw[id_col] = df_raw[id_col].astype(str)
+    csv_cols = [id_col] + list(dict.fromkeys(DISPLAY_COLUMNS + model_features))
+    df_raw = pd.read_csv(
+        CENSUS_PATH,
+        usecols=csv_cols,
+        dtype={id_col: str, **COUNT_DTYPES}
+    )
     
     # Merge for display, but we keep model_features list clean from the original df_raw
-    df = df_raw.merge(names_lookup, left_on=id_col, right_on=code_col, how='left')
+    # validate='m:1' fails loudly if a boundary code is ever duplicated instead of silently fanning out rows
+    df = df_raw.merge(names_lookup, left_on=id_col, right_on=code_col, how='left', validate='m:1')
     df = df.rename(columns={name_col: 'DISPLAY_NAME'})
-
-    # Pre-format map hover string specifically for tooltip
-    gdf['stress_label'] = gdf['housing_stress_index'].apply(lambda x: f"{x:.2f}")
     
-    return json.loads(gdf.to_json()), df, model_features
-
-geojson_data, df_master, model_keys = load_data()
+    # Selectable areas and the sidebar's sorted options, computed once rather than on every rerun
+    valid_df = df.dropna(subset=['DISPLAY_NAME']).reset_index(drop=True)
+    area_options = ["Show All WA"] + sorted(valid_df['DISPLAY_NAME'].unique().tolist())
+    # Position of each option, for the selectbox's index= without a list scan
+    option_index = {name: i for i, name in enumerate(area_options)}
+    # Indexed by name so the selected area's row is a hashed lookup, not a column scan.
+    # Names must be unique for .loc to return a single row rather than a frame.
+    valid_by_name = valid_df.set_index('DISPLAY_NAME', drop=False, verify_integrity=True)
+    # Baseline model inputs as one contiguous matrix (row per area, column per feature)
+    # for the scenario simulator, plus the row position of each area name
+    feature_matrix = valid_df[model_features].to_numpy(dtype=np.float64)
+    name_to_idx = {name: i for i, name in enumerate(valid_df['DISPLAY_NAME'])}
+    
+    return (geojson_detail_bytes, model_features,
+            valid_df, area_options, option_index, valid_by_name, feature_matrix, name_to_idx)
+
+(geojson_detail_bytes, model_keys,
+ valid_df, area_options, option_index, valid_by_name, feature_matrix, name_to_idx) = load_data(data_version)
+# Column position of each model feature within feature_matrix
+feature_idx = {k: i for i, k in enumerate(model_keys)}
+
+@st.cache_resource(show_spinner=False)
+def detail_features_by_name(data_version):
+    """
+    Index the detail layer's features by area name. Decoded once per 'data_version'
+    and shared across sessions; orjson parses the coordinate arrays several times faster than json.
+    """
+    features = orjson.loads(geojson_detail_bytes)['features']
+    return {f['properties']['SAL_NAME21']: f for f in features}
+
+# --- SCENARIO SIMULATOR CONTROLS ---
+# A fragment rather than a form: dragging a slider only reruns this panel, and
+# the Scenario Results view reads the values from session state by key.
+@st.fragment
+def render_simulator_controls():
+    """Render the scenario sliders in the sidebar."""
+    st.subheader("Scenario Simulator")
+    st.slider("Weekly Income Adjustment ($)", -500, 500, 0, step=50, key="inc_adj")
+    st.slider("Weekly Rent Adjustment ($)", -200, 200, 0, step=20, key="rent_adj")
+    st.slider("Weekly Mortgage Adjustment ($)", -200, 200, 0, step=20, key="mort_adj")
+    st.slider("Unemployment Change (%)", -5.0, 10.0, 0.0, step=0.5, key="unemp_adj")
+    st.slider("Mining Workforce Change (%)", -10.0, 10.0, 0.0, step=1.0, key="mining_adj")
+    st.checkbox("Include income sensitivity sweep", key="sweep_income")
+    st.caption("Run the scenario with 'Calculate Prediction' on the 📈 Scenario Results view.")
 
 # Initialize session state for the confirmed selection
 # This ensures "Show All WA" is the default on initial load.
@@ -140,9 +233,11 @@ with st.sidebar:
         st.warning("Mode: Local Inference")
         if st.button("Connect to API"):
             st.session_state.use_local = False
+            # Drop the cached "offline" result so the reconnect is re-probed
+            cached_health.clear()
             st.rerun()
     else:
-        is_online = check_api_health() # This has its own timeout in api_client
+        is_online = cached_health() # Re-probed at most every 30s; has its own timeout in api_client
         if is_online:
             st.success("API Status: Online")
         else:
@@ -151,16 +246,15 @@ with st.sidebar:
             st.rerun()
     
     st.divider()
-    valid_df = df_master.dropna(subset=['DISPLAY_NAME'])
     
     # --- AREA SELECTION FORM ---
     # wrapping this in a form prevents selectbox from triggering a rerun until button is hit
     with st.form("area_selection_form"):
         selected_option = st.selectbox(
             "Choose an Area", 
-            ["Show All WA"] + sorted(valid_df['DISPLAY_NAME'].unique()),
+            area_options,
             # Ensures dropdown visually reflects what is actually currently loaded
-            index=(["Show All WA"] + sorted(valid_df['DISPLAY_NAME'].unique())).index(st.session_state.confirmed_selection)
+            index=option_index[st.session_state.confirmed_selection]
         )
 
         # Button acts as the "Calculate" equivalent for the map and metrics
@@ -174,271 +268,402 @@ with st.sidebar:
     st.caption("Low (0%) <----------------------> High (100%)")
     
     st.divider()
-    with st.form("simulator_form"):
-        st.subheader("Scenario Simulator")
-        inc_adj = st.slider("Weekly Income Adjustment ($)", -500, 500, 0, step=50)
-        rent_adj = st.slider("Weekly Rent Adjustment ($)", -200, 200, 0, step=20)
-        mort_adj = st.slider("Weekly Mortgage Adjustment ($)", -200, 200, 0, step=20)
-        unemp_adj = st.slider("Unemployment Change (%)", -5.0, 10.0, 0.0, step=0.5)
-        mining_adj = st.slider("Mining Workforce Change (%)", -10.0, 10.0, 0.0, step=1.0)
-        
-        run_calc = st.form_submit_button("Calculate Prediction", type="primary", use_container_width=True)
-        if run_calc:
-            # Set the session state to the target tab name
-            st.session_state.active_tab = "📈 Scenario Results"
+    render_simulator_controls()
 
 # Use the confirmed selection for the rest of the app logic
 active_area = st.session_state.confirmed_selection
 
-# --- MAIN CONTENT ---
-st.title("WA Housing Model 2021")
-
-# We define the tab labels and use the session state to set the default value
-tab_titles = ["🗺️ Geospatial View", "📊 Area Metrics", "📈 Scenario Results"]
-tab1, tab2, tab3 = st.tabs(tab_titles)
-
-with tab1:
+# --- LOCAL INFERENCE ---
+def predict_local(x):
+    """
+    Predict with the local model from a 2D float array whose columns are in model_keys order.
+    Skips building a DataFrame per call; the column order is already fixed by model_keys.
+    """
+    model, mean, scale = load_local_arrays(model_version)
+    # StandardScaler.transform inlined, skipping sklearn's per-call input validation
+    return model.predict((x - mean) / scale)
+
+# --- SCENARIO SWEEP ---
+def predict_sweep(rows):
+    """
+    Predict several scenarios at once, preferring a single batch request to the API.
+    Falls back to concurrent single requests if the service has no batch endpoint,
+    then to one local model call if the API is unavailable.
+    Returns the predictions and the source that produced them, so a sweep that fell
+    back mid-session is labelled as local rather than passed off as "Live API".
+    """
+    if not st.session_state.use_local:
+        resp = get_predictions_batch(rows)
+        if 'predictions' in resp:
+            return [float(v) for v in resp['predictions']], 'Live API'
+        # Older services only expose /predict
+        if resp.get('status_code') == 404:
+            results = run_async(aget_predictions(rows))
+            if all('predicted_housing_stress_index' in r for r in results):
+                return [float(r['predicted_housing_stress_index']) for r in results], 'Live API'
+
+    x = np.array([[row[k] for k in model_keys] for row in rows], dtype=np.float64)
+    return predict_local(x).tolist(), 'Local Mode'
+
+# --- TAB RENDERERS ---
+# Only the visible view's renderer is called on each rerun (see MAIN CONTENT).
+@st.cache_resource(show_spinner=False, max_entries=32)
+def build_deck(active_area, data_version):
+    """
+    Build the map Deck for a selection. Cached per area (and 'data_version'), so reruns
+    that do not change the selection reuse the same layers and view instead of rebuilding them.
+    """
     # Default view (Perth)
     view_state = pdk.ViewState(latitude=-31.95, longitude=115.86, zoom=6)
-    # Visual distinctness for selection
-    highlight_color = [0, 255, 255, 255] 
-    
+
     if active_area != "Show All WA":
-        area_data = valid_df[valid_df['DISPLAY_NAME'] == active_area].iloc[0]
+        # Scalar .at lookups; only the centroid is needed, not the whole row
         view_state = pdk.ViewState(
-            latitude=area_data['centroid_lat'], 
-            longitude=area_data['centroid_lon'], 
+            latitude=valid_by_name.at[active_area, 'centroid_lat'], 
+            longitude=valid_by_name.at[active_area, 'centroid_lon'], 
             zoom=12,
             pitch=45
         )
 
+    # Coarse geometry for the state-wide view, finer geometry once zoomed to an area.
+    # Passed by URL so the browser downloads and caches each layer once, rather than
+    # receiving the whole FeatureCollection inline with every render.
+    geojson_url = OVERVIEW_GEOJSON_URL if active_area == "Show All WA" else DETAIL_GEOJSON_URL
+
+    # Base layer props are the same for every selection
     layers = [
         pdk.Layer(
             "GeoJsonLayer",
-            geojson_data,
+            geojson_url,
             opacity=0.4,
             stroked=True,
             filled=True,
             get_fill_color="[255, (1 - properties.housing_stress_index / 100) * 255, 0, 150]",
-            get_line_color=f"properties.SAL_NAME21 == '{active_area}' ? {highlight_color} : [255, 255, 255, 50]",
-            line_width_min_pixels=6 if active_area != "Show All WA" else 1,
+            get_line_color=BASE_LINE_COLOR,
+            line_width_min_pixels=1,
             pickable=True
         )
     ]
+    # The selection outline is a separate one-feature layer drawn on top
+    selected = detail_features_by_name(data_version).get(active_area)
+    if selected is not None:
+        layers.append(pdk.Layer(
+            "GeoJsonLayer",
+            {"type": "FeatureCollection", "features": [selected]},
+            stroked=True,
+            filled=False,
+            get_line_color=HIGHLIGHT_LINE_COLOR,
+            line_width_min_pixels=6
+        ))
+    return pdk.Deck(
+        layers=layers, 
+        initial_view_state=view_state,
+        tooltip={"text": "Area: {SAL_NAME21}\nStress Index: {stress_label}%"}
+    )
+
+def render_map(active_area):
+    """Render the stress choropleth, highlighting the active area."""
     # Spinner for notifying that the geospatial layers are rendering
     with st.spinner("Loading..."):
-        st.pydeck_chart(pdk.Deck(
-            layers=layers, 
-            initial_view_state=view_state,
-            tooltip={"text": "Area: {SAL_NAME21}\nStress Index: {stress_label}%"}
-        ))
+        st.pydeck_chart(build_deck(active_area, data_version))
+
+@st.cache_data(show_spinner=False)
+def build_workforce_pie(mining_jobs, non_mining):
+    """Build the mining vs non-mining donut; cached so reruns reuse an identical figure."""
+    # Use Plotly Pie to fix the "empty chart until maximized" rendering bug
+    fig = px.pie(
+        values=[mining_jobs, non_mining],
+        names=['Mining', 'Non-Mining'],
+        hole=0.4,
+        color_discrete_sequence=["#6cd48c", "#bd8112"]
+    )
 
-if active_area != "Show All WA":
-    area_row = valid_df[valid_df['DISPLAY_NAME'] == active_area].iloc[0]
+    fig.update_traces(hovertemplate="<b>Sector:</b> %{label}<br><b>Count:</b> %{value:,.0f}<extra></extra>")
+    fig.update_layout(
+        margin=dict(l=0, r=0, t=0, b=0),
+        showlegend=True,
+        legend=dict(orientation="h", yanchor="bottom", y=-0.2, xanchor="center", x=0.5)
+    )
+    return fig
+
+@st.cache_data(show_spinner=False)
+def stress_histogram(data_version, nbins=50):
+    """
+    Bin the state-wide stress index once per 'data_version'; returns bar centres, widths and counts.
+    Missing values are dropped first, as px.histogram did (np.histogram rejects NaN).
+    """
+    counts, edges = np.histogram(valid_df['housing_stress_index'].dropna().to_numpy(), bins=nbins)
+    return (edges[:-1] + edges[1:]) / 2, np.diff(edges), counts
+
+def render_area_metrics(active_area, area_row):
+    """Render the baseline metrics and charts for the selected area."""
+    st.subheader(f"Baseline Stats: {active_area}")
+    c1, c2, c3, c4, c5 = st.columns(5)
+    c1.metric("Avg. Weekly Income", f"${area_row['avg_weekly_income']:,.0f}")
+    c2.metric("Avg. Weekly Rent", f"${area_row['avg_weekly_rent']:,.0f}")
+    c3.metric("Avg. Weekly Mortgage", f"${area_row['avg_weekly_mortgage']:,.0f}")
+    c4.metric("Modelled Housing Stress", f"{area_row['housing_stress_index']:.1f}%")
+    c5.metric("Mining Jobs", f"{area_row['total_mining']:.0f}")
+
+    # Charts
+    st.divider()
+    col_left, col_mid, col_right = st.columns(3)
+
+    with col_left:
+        st.write("Employment Breakdown")
+        # A named Series is enough for st.bar_chart; no DataFrame + set_index needed
+        emp_data = pd.Series(
+            [area_row['total_employed_full_time'], area_row['total_employed_part_time'], area_row['total_unemployed']],
+            index=pd.Index(['Full Time', 'Part Time', 'Unemployed'], name='Status'), name='Count'
+        )
+        st.bar_chart(emp_data, color="#99d5ff", x_label="Employment Status", y_label="No. of People")
+
+    with col_mid:
+        st.write("Housing Tenure Mix")
+        tenure_data = pd.Series(
+            [area_row['renting_households_count'], area_row['mortgage_households_count']],
+            index=pd.Index(['Renting', 'Mortgage'], name='Type'), name='Count'
+        )
+        st.bar_chart(tenure_data, color="#ff9999", x_label="Tenure Type", y_label="No. of Households")
+
+    with col_right:
+        st.write("Mining vs Non-Mining Workforce")
+        total_workforce = area_row['total_employed_full_time'] + area_row['total_employed_part_time']
+        mining_jobs = area_row['total_mining']
+        non_mining = max(0, total_workforce - mining_jobs)
+
+        fig = build_workforce_pie(float(mining_jobs), float(non_mining))
+        st.plotly_chart(fig, use_container_width=True, key=f"pie_{active_area}")
+
+    # --- HOUSING STRESS DISTRIBUTION ---
+    st.divider()
+    st.subheader("State-wide Stress Distribution")
+    st.write(f"How {active_area} compares to all other areas in Western Australia.")
+
+    # Pre-binned, so the figure carries 50 bars rather than every area's value
+    centers, widths, counts = stress_histogram(data_version)
+    hist_fig = go.Figure(go.Bar(x=centers, y=counts, width=widths, marker_color='#cbd5e0'))
+
+    # Add a vertical line for the selected area
+    hist_fig.add_vline(
+        x=area_row['housing_stress_index'], 
+        line_width=3, 
+        line_dash="dash", 
+        line_color="#e53e3e",
+        annotation_text=f"{active_area}: {area_row['housing_stress_index']:.1f}%",
+        annotation_position="top right"
+    )
+
+    hist_fig.update_traces(hovertemplate="<b>Stress Level:</b> %{x:.1f}%<br><b>Areas Count:</b> %{y}<extra></extra>")
+    hist_fig.update_layout(
+        title="Distribution of Housing Stress Across WA",
+        margin=dict(l=0, r=0, t=40, b=0),
+        height=350,
+        bargap=0,
+        xaxis_title="Housing Stress Index (%)",
+        yaxis_title="Number of Areas"
+    )
+    st.plotly_chart(hist_fig, use_container_width=True)
+
+# Rows of the scenario comparison table: three dollar amounts, a rate, then a headcount
+COMPARISON_ROWS = ["Avg. Weekly Income", "Avg. Weekly Rent", "Avg. Weekly Mortgage", "Unemployment Rate", "Mining Workforce"]
+
+def render_scenario_results(scenario, area_row):
+    """Render a calculated scenario against the selected area's baseline."""
+    inc_adj, rent_adj, mort_adj, unemp_adj, mining_adj = scenario['adjustments']
+    sim_data = scenario['sim_data']
+    prediction_val = scenario['prediction']
     
-    with tab2:
-        st.subheader(f"Baseline Stats: {active_area}")
-        c1, c2, c3, c4, c5 = st.columns(5)
-        c1.metric("Avg. Weekly Income", f"${area_row['avg_weekly_income']:,.0f}")
-        c2.metric("Avg. Weekly Rent", f"${area_row['avg_weekly_rent']:,.0f}")
-        c3.metric("Avg. Weekly Mortgage", f"${area_row['avg_weekly_mortgage']:,.0f}")
-        c4.metric("Modelled Housing Stress", f"{area_row['housing_stress_index']:.1f}%")
-        c5.metric("Mining Jobs", f"{area_row['total_mining']:.0f}")
-
-        # Charts
-        st.divider()
-        col_left, col_mid, col_right = st.columns(3)
-        
-        with col_left:
-            st.write("Employment Breakdown")
-            emp_data = pd.DataFrame({
-                'Status': ['Full Time', 'Part Time', 'Unemployed'],
-                'Count': [area_row['total_employed_full_time'], area_row['total_employed_part_time'], area_row['total_unemployed']]
-            })
-            st.bar_chart(emp_data.set_index('Status'), color="#99d5ff", x_label="Employment Status", y_label="No. of People")
-            
-        with col_mid:
-            st.write("Housing Tenure Mix")
-            tenure_data = pd.DataFrame({
-                'Type': ['Renting', 'Mortgage'],
-                'Count': [area_row['renting_households_count'], area_row['mortgage_households_count']]
-            })
-            st.bar_chart(tenure_data.set_index('Type'), color="#ff9999", x_label="Tenure Type", y_label="No. of Households")
-
-        with col_right:
-            st.write("Mining vs Non-Mining Workforce")
-            total_workforce = area_row['total_employed_full_time'] + area_row['total_employed_part_time']
-            mining_jobs = area_row['total_mining']
-            non_mining = max(0, total_workforce - mining_jobs)
-            
-            # Use Plotly Pie to fix the "empty chart until maximized" rendering bug
-            fig = px.pie(
-                values=[mining_jobs, non_mining],
-                names=['Mining', 'Non-Mining'],
-                hole=0.4,
-                color_discrete_sequence=["#6cd48c", "#bd8112"]
-            )
-            
-            fig.update_traces(hovertemplate="<b>Sector:</b> %{label}<br><b>Count:</b> %{value:,.0f}<extra></extra>")
-            fig.update_layout(
-                margin=dict(l=0, r=0, t=0, b=0),
-                showlegend=True,
-                legend=dict(orientation="h", yanchor="bottom", y=-0.2, xanchor="center", x=0.5)
-            )
-            st.plotly_chart(fig, use_container_width=True, key=f"pie_{active_area}")
+    st.success(f"Simulation Complete ({scenario['source']})")
+    
+    curr_val = area_row['housing_stress_index']
+    st.metric(
+        label="Predicted Housing Stress Index", 
+        value=f"{prediction_val:.2f}%", 
+        delta=f"{prediction_val - curr_val:.2f}%", 
+        delta_color="inverse"
+    )
+    
+    st.write(f"The simulated changes result in a **{abs(prediction_val - curr_val):.2f}%** {'increase' if prediction_val > curr_val else 'decrease'} in housing stress for {scenario['area']}.")
+    
+    # --- FEATURE IMPORTANCE PLOT ---
+    st.divider()
+    st.subheader("Scenario Change Intensity")
+
+    impact_data = pd.Series(
+        [abs(inc_adj)/500, abs(rent_adj)/200, abs(mort_adj)/200, abs(unemp_adj)/10, abs(mining_adj)/10],
+        index=['Income', 'Rent', 'Mortgage', 'Unemployment', 'Mining']
+    ).sort_values(ascending=True)
+
+    fig_imp = px.bar(
+        x=impact_data.values,
+        y=impact_data.index,
+        orientation='h',
+        title="Magnitude of Input Adjustments",
+        labels={'x': 'Normalised Adjustment Factor (0-1)', 'y': 'Feature', 'color': 'Relative Change'},
+        color=impact_data.values,
+        color_continuous_scale='Blues'
+    )
+    fig_imp.update_layout(showlegend=False, height=300, margin=dict(l=0, r=0, t=40, b=0))
+    st.plotly_chart(fig_imp, use_container_width=True)
+
+    # --- SCENARIO COMPARISON TABLE ---
+    st.divider()
+    st.subheader("Scenario Comparison Detail")
+
+    # Raw numbers, formatted lazily by the Styler when the table is rendered
+    comparison_df = pd.DataFrame({
+        "Baseline": [
+            area_row['avg_weekly_income'], area_row['avg_weekly_rent'], area_row['avg_weekly_mortgage'],
+            area_row['unemployment_rate'], area_row['total_mining']
+        ],
+        "Simulated": [
+            sim_data['avg_weekly_income'], sim_data['avg_weekly_rent'], sim_data['avg_weekly_mortgage'],
+            sim_data['unemployment_rate'], sim_data['total_mining']
+        ],
+        "Change": [inc_adj, rent_adj, mort_adj, unemp_adj, mining_adj]
+    }, index=pd.Index(COMPARISON_ROWS, name="Parameter"))
+
+    money_rows, rate_row, mining_row = COMPARISON_ROWS[:3], COMPARISON_ROWS[3], COMPARISON_ROWS[4]
+    values = ["Baseline", "Simulated"]
+    comparison_style = (
+        comparison_df.style
+        .format("${:,.0f}", subset=pd.IndexSlice[money_rows, values])
+        .format("{:.1f}%", subset=pd.IndexSlice[[rate_row], values])
+        .format("{:,.0f}", subset=pd.IndexSlice[[mining_row], values])
+        .format(lambda v: f"{'+' if v > 0 else ''}${v:,.0f}", subset=pd.IndexSlice[money_rows, "Change"])
+        .format(lambda v: f"{'+' if v > 0 else ''}{v:.1f}%", subset=pd.IndexSlice[[rate_row], "Change"])
+        .format("{:.1f}% factor", subset=pd.IndexSlice[[mining_row], "Change"])
+    )
+    st.table(comparison_style)
 
-        # --- HOUSING STRESS DISTRIBUTION ---
+    # --- INCOME SENSITIVITY SWEEP ---
+    if scenario['sweep'] is not None:
         st.divider()
-        st.subheader("State-wide Stress Distribution")
-        st.write(f"How {active_area} compares to all other areas in Western Australia.")
+        st.subheader("Income Sensitivity")
         
-        hist_fig = px.histogram(
-            valid_df, 
-            x="housing_stress_index",
-            nbins=50,
-            title="Distribution of Housing Stress Across WA",
-            labels={'housing_stress_index': 'Housing Stress Index (%)'},
-            color_discrete_sequence=['#cbd5e0']
+        sweep_deltas, sweep_preds, sweep_source = scenario['sweep']
+        fig_sweep = px.line(
+            x=sweep_deltas,
+            y=sweep_preds,
+            markers=True,
+            title=f"Predicted Stress Across Income Adjustments ({sweep_source})",
+            labels={'x': 'Weekly Income Adjustment ($)', 'y': 'Predicted Housing Stress Index (%)'}
         )
+        fig_sweep.add_vline(x=inc_adj, line_width=2, line_dash="dash", line_color="#e53e3e")
+        fig_sweep.update_layout(height=300, margin=dict(l=0, r=0, t=40, b=0))
+        st.plotly_chart(fig_sweep, use_container_width=True)
+        if sweep_source != scenario['source']:
+            st.caption("The API batch request failed, so the sweep fell back to the local model "
+                       f"and may not line up with the {scenario['source']} prediction above.")
+
+@st.fragment
+def render_scenario_view(active_area, area_row):
+    """
+    Run and display a scenario for the selected area. Clicking 'Calculate Prediction'
+    only reruns this view, so the map, metrics and sidebar are not rebuilt.
+    """
+    if st.button("Calculate Prediction", type="primary"):
+        with st.spinner('Calculating Scenario Impacts...'):
+            # Current slider values from the sidebar panel
+            inc_adj, rent_adj, mort_adj, unemp_adj, mining_adj = (
+                st.session_state[k] for k in ('inc_adj', 'rent_adj', 'mort_adj', 'unemp_adj', 'mining_adj')
+            )
 
-        # Add a vertical line for the selected area
-        hist_fig.add_vline(
-            x=area_row['housing_stress_index'], 
-            line_width=3, 
-            line_dash="dash", 
-            line_color="#e53e3e",
-            annotation_text=f"{active_area}: {area_row['housing_stress_index']:.1f}%",
-            annotation_position="top right"
-        )
-        
-        hist_fig.update_traces(hovertemplate="<b>Stress Level:</b> %{x:.1f}%<br><b>Areas Count:</b> %{y}<extra></extra>")
-        hist_fig.update_layout(margin=dict(l=0, r=0, t=40, b=0), height=350, yaxis_title="Number of Areas")
-        st.plotly_chart(hist_fig, use_container_width=True)
-
-    with tab3:
-        if run_calc:
-            with st.spinner('Calculating Scenario Impacts...'):
-                # Prepare workspace
-                sim_data = area_row.to_dict()
-                
-                # Apply Adjustments
-                sim_data['avg_weekly_income'] += inc_adj
-                sim_data['avg_weekly_rent'] += rent_adj
-                sim_data['avg_weekly_mortgage'] += mort_adj
-                sim_data['unemployment_rate'] = max(0, sim_data['unemployment_rate'] + unemp_adj)
-                sim_data['total_mining'] = max(0, sim_data['total_mining'] * (1 + mining_adj/100))
-
-                # Payload: Strictly filter to the model_keys
-                payload = {k: float(sim_data[k]) for k in model_keys if k in sim_data}
-
-                # --- PREDICTION LOGIC (API vs LOCAL) ---
-                prediction_val = None
+            # Prepare workspace from the precomputed baseline model inputs
+            feature_row = feature_matrix[name_to_idx[active_area]].copy()
+            
+            # Apply Adjustments
+            sim_data = {
+                'avg_weekly_income': area_row['avg_weekly_income'] + inc_adj,
+                'avg_weekly_rent': area_row['avg_weekly_rent'] + rent_adj,
+                'avg_weekly_mortgage': area_row['avg_weekly_mortgage'] + mort_adj,
+                'unemployment_rate': max(0, area_row['unemployment_rate'] + unemp_adj),
+                'total_mining': max(0, area_row['total_mining'] * (1 + mining_adj/100))
+            }
+
+            # Payload: only adjusted values that are model features override the baseline
+            for k, v in sim_data.items():
+                if k in feature_idx:
+                    feature_row[feature_idx[k]] = v
+            payload = dict(zip(model_keys, feature_row.tolist()))
+
+            # --- PREDICTION LOGIC (API vs LOCAL) ---
+            prediction_val = None
+            # Labelled by whichever branch actually produced the value, not by use_local,
+            # since a failed or short-circuited API call falls through to the local model
+            prediction_source = 'Live API'
+            
+            if not st.session_state.use_local:
+                try:
+                    # Attempt API call
+                    resp = get_prediction(payload)
+                    if resp and 'predicted_housing_stress_index' in resp:
+                        prediction_val = resp['predicted_housing_stress_index']
+                except Exception:
+                    st.session_state.use_local = True
+                    st.warning("API connection failed during calculation. Falling back to local model.")
+
+            # Fallback to local joblib if API failed or we are in local mode
+            if prediction_val is None:
+                prediction_source = 'Local Mode'
+                try:
+                    # feature_row is already ordered to match model training features
+                    prediction_val = float(predict_local(feature_row.reshape(1, -1))[0])
+                except Exception as e:
+                    st.error(f"Local inference failed: {e}")
+
+            # Keep the result so it survives switching views until the next calculation
+            if prediction_val is not None:
+                sweep = None
+                if st.session_state.sweep_income:
+                    # Every income step with the other adjustments held fixed, sent as one batch
+                    sweep_deltas = list(range(-500, 501, 50))
+                    sweep_rows = [dict(payload, avg_weekly_income=float(area_row['avg_weekly_income'] + d)) for d in sweep_deltas]
+                    sweep = (sweep_deltas, *predict_sweep(sweep_rows))
                 
-                if not st.session_state.use_local:
-                    try:
-                        # Attempt API call
-                        resp = get_prediction(payload)
-                        if resp and 'predicted_housing_stress_index' in resp:
-                            prediction_val = resp['predicted_housing_stress_index']
-                    except Exception:
-                        st.session_state.use_local = True
-                        st.warning("API connection failed during calculation. Falling back to local model.")
-
-                # Fallback to local joblib if API failed or we are in local mode
-                if prediction_val is None:
-                    try:
-                        model, scaler = load_local_models()
-                        input_df = pd.DataFrame([payload])
-                        # Reorder to match model training features
-                        input_df = input_df[model_keys]
-                        scaled_data = scaler.transform(input_df)
-                        prediction_val = model.predict(scaled_data)[0]
-                    except Exception as e:
-                        st.error(f"Local inference failed: {e}")
-
-                # --- DISPLAY RESULTS ---
-                if prediction_val is not None:
-                    st.balloons()
-                    st.success(f"Simulation Complete ({'Local Mode' if st.session_state.use_local else 'Live API'})")
-                    
-                    curr_val = area_row['housing_stress_index']
-                    st.metric(
-                        label="Predicted Housing Stress Index", 
-                        value=f"{prediction_val:.2f}%", 
-                        delta=f"{prediction_val - curr_val:.2f}%", 
-                        delta_color="inverse"
-                    )
-                    
-                    st.write(f"The simulated changes result in a **{abs(prediction_val - curr_val):.2f}%** {'increase' if prediction_val > curr_val else 'decrease'} in housing stress for {active_area}.")
-                    
-                    # --- FEATURE IMPORTANCE PLOT ---
-                    st.divider()
-                    st.subheader("Scenario Change Intensity")
-                    
-                    impact_data = pd.DataFrame({
-                        'Feature': ['Income', 'Rent', 'Mortgage', 'Unemployment', 'Mining'],
-                        'Relative Change': [abs(inc_adj)/500, abs(rent_adj)/200, abs(mort_adj)/200, abs(unemp_adj)/10, abs(mining_adj)/10]
-                    }).sort_values('Relative Change', ascending=True)
-
-                    fig_imp = px.bar(
-                        impact_data,
-                        x='Relative Change',
-                        y='Feature',
-                        orientation='h',
-                        title="Magnitude of Input Adjustments",
-                        labels={'Relative Change': 'Normalised Adjustment Factor (0-1)'},
-                        color='Relative Change',
-                        color_continuous_scale='Blues'
-                    )
-                    fig_imp.update_layout(showlegend=False, height=300, margin=dict(l=0, r=0, t=40, b=0))
-                    st.plotly_chart(fig_imp, use_container_width=True)
-
-                    # --- SCENARIO COMPARISON TABLE ---
-                    st.divider()
-                    st.subheader("Scenario Comparison Detail")
-                    
-                    comparison_df = pd.DataFrame({
-                        "Parameter": ["Avg. Weekly Income", "Avg. Weekly Rent", "Avg. Weekly Mortgage", "Unemployment Rate", "Mining Workforce"],
-                        "Baseline": [
-                            f"${area_row['avg_weekly_income']:,.0f}",
-                            f"${area_row['avg_weekly_rent']:,.0f}",
-                            f"${area_row['avg_weekly_mortgage']:,.0f}",
-                            f"{area_row['unemployment_rate']:.1f}%",
-                            f"{area_row['total_mining']:,.0f}"
-                        ],
-                        "Simulated": [
-                            f"${sim_data['avg_weekly_income']:,.0f}",
-                            f"${sim_data['avg_weekly_rent']:,.0f}",
-                            f"${sim_data['avg_weekly_mortgage']:,.0f}",
-                            f"{sim_data['unemployment_rate']:.1f}%",
-                            f"{sim_data['total_mining']:,.0f}"
-                        ],
-                        "Change": [
-                            f"{'+' if inc_adj > 0 else ''}${inc_adj:,.0f}",
-                            f"{'+' if rent_adj > 0 else ''}${rent_adj:,.0f}",
-                            f"{'+' if mort_adj > 0 else ''}${mort_adj:,.0f}",
-                            f"{'+' if unemp_adj > 0 else ''}{unemp_adj:.1f}%",
-                            f"{(mining_adj):.1f}% factor"
-                        ]
-                    })
-                    st.table(comparison_df)
-        else:
-            st.info("Adjust the sliders in the sidebar and click 'Calculate Prediction' to see results here.")
-
-# Forces the browser to click the tab button via JS
-# because st.tabs doesn't seem to support a 'selected' index parameter natively.
-if st.session_state.active_tab == "📈 Scenario Results":
-    st.components.v1.html(
-        """
-        <script>
-            var tabs = window.parent.document.querySelectorAll('button[data-baseweb="tab"]');
-            tabs[2].click();
-        </script>
-        """,
-        height=0,
-    )
-    # Reset state so it doesn't hijack manual navigation later
-    st.session_state.active_tab = ""
+                st.session_state.scenario = {
+                    'area': active_area,
+                    'adjustments': (inc_adj, rent_adj, mort_adj, unemp_adj, mining_adj),
+                    'sim_data': sim_data,
+                    'prediction': prediction_val,
+                    'source': prediction_source,
+                    'sweep': sweep
+                }
+                st.balloons()
+
+    # --- DISPLAY RESULTS ---
+    scenario = st.session_state.get('scenario')
+    if scenario is not None and scenario['area'] == active_area:
+        render_scenario_results(scenario, area_row)
+    else:
+        st.info("Adjust the sliders in the sidebar and click 'Calculate Prediction' to see results here.")
+
+# --- MAIN CONTENT ---
+st.title("WA Housing Model 2021")
+
+# st.tabs executes every tab body on each rerun, so the views are switched with a
+# session-state backed selector and only the visible one is built.
+# Setting st.session_state.active_tab changes the view.
+tab_titles = ["🗺️ Geospatial View", "📊 Area Metrics", "📈 Scenario Results"]
+active_tab = st.radio("View", tab_titles, key="active_tab", horizontal=True, label_visibility="collapsed")
+
+if active_tab == "🗺️ Geospatial View":
+    render_map(active_area)
+
+if active_area != "Show All WA":
+    area_row = valid_by_name.loc[active_area]
+    
+    if active_tab == "📊 Area Metrics":
+        render_area_metrics(active_area, area_row)
+
+    if active_tab == "📈 Scenario Results":
+        render_scenario_view(active_area, area_row)
 
 else:
-    st.info("Select a specific area from the sidebar to enable the Area Metrics and Scenario Simulator.")
\ No newline at end of file
+    st.info("Select a specific area from the sidebar to enable the Area Metrics and Scenario Simulator.")
+
+# In local mode, warm the model cache after the page has been drawn so the
+# first "Calculate Prediction" does not wait on the joblib load
+if st.session_state.use_local:
+    load_local_arrays(model_version)
@@ -0,0 +1,75 @@
+import threading
+import time
+
+class CircuitBreaker:
+    """
+    Minimal CLOSED/OPEN/HALF_OPEN circuit breaker for calls to the Flask API.
+    After 'failure_threshold' consecutive failures within 'failure_window' seconds
+    the circuit opens and calls are short-circuited for 'recovery_seconds'.
+    Once the cooldown elapses a single probe is let through to test the service.
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold=3, recovery_seconds=15, failure_window=60):
+        self.failure_threshold = failure_threshold
+        self.recovery_seconds = recovery_seconds
+        self.failure_window = failure_window
+        # Streamlit serves each browser session on its own thread
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._failures = 0
+        self._first_failure_at = None
+        self._opened_at = None
+        self._probe_in_flight = False
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self):
+        if self._opened_at is None:
+            return self.CLOSED
+        if time.monotonic() - self._opened_at >= self.recovery_seconds:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def allow_request(self):
+        """Return True if a call may be attempted right now."""
+        with self._lock:
+            state = self._current_state()
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._reset()
+
+    def record_failure(self):
+        with self._lock:
+            now = time.monotonic()
+            # A failed probe re-opens the circuit for another cooldown
+            if self._probe_in_flight:
+                self._opened_at = now
+                self._probe_in_flight = False
+                return
+
+            # Only count failures that are consecutive within the window
+            if self._first_failure_at is None or now - self._first_failure_at > self.failure_window:
+                self._failures = 0
+                self._first_failure_at = now
+            self._failures += 1
+
+            if self._failures >= self.failure_threshold:
+                self._opened_at = now
+
+# Shared by the sync and async API clients so both see the same failure history
+prediction_breaker = CircuitBreaker(failure_threshold=3, recovery_seconds=15)